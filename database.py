@@ -1,12 +1,16 @@
 """
 Database models and setup for game tracking
 """
+import atexit
+import queue
 import sqlite3
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import os
-import uuid
+import secrets
+import orjson
 
 # Database file path
 # Use Railway volume if available, otherwise use local directory
@@ -20,115 +24,383 @@ else:
     DB_DIR = Path(__file__).parent  # Fallback to local directory for development
 DB_PATH = DB_DIR / "games.db"
 
+# Seed files for the admin content tables (imported once, on first boot)
+DATA_DIR = Path(__file__).parent / "data"
+
+# Admin content tables -> (seed JSON file, id prefix for items without one)
+CONTENT_TABLES = {
+    "flavor_text": ("flavor_text.json", "flavor"),
+    "recruitment_candidates": ("recruitment_candidates.json", "candidate"),
+    "news_templates": ("news_templates.json", "news"),
+}
+
+# Seed file for the messages table (imported once, on first boot)
+MESSAGES_SEED_FILE = "messages.json"
+
+# Format SQLite's datetime('now') produces; timestamps are stored in this form (UTC)
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Process-wide pool of configured connections, handed out by acquire().
+# Reusing connections keeps SQLite's page cache and compiled statements warm.
+POOL_SIZE = 8
+_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+
 def get_db_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+    """Open a new, tuned database connection"""
+    # check_same_thread=False since pooled connections move between worker threads;
+    # a larger statement cache keeps the app's prepared statements compiled across calls
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
+    
+    # Per-connection tuning (journal_mode=WAL is persistent and set in init_database)
+    conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; no fsync on every commit
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # ~64MB page cache
+    conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped I/O
     return conn
 
-def init_database():
-    """Initialize database tables"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Games in progress table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS games_in_progress (
-            id TEXT PRIMARY KEY,
-            fund_name TEXT NOT NULL,
-            time_started TIMESTAMP NOT NULL,
-            geolocation TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Historical games table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS historical_games (
-            id TEXT PRIMARY KEY,
-            fund_name TEXT NOT NULL,
-            time_started TIMESTAMP NOT NULL,
-            time_ended TIMESTAMP,
-            completed BOOLEAN NOT NULL DEFAULT 0,
-            geolocation TEXT,
-            time_played TEXT,
-            total_pnl REAL,
-            shareable_id TEXT UNIQUE,
-            results_data TEXT,
-            firm_cash REAL,
-            game_days_played INTEGER,
-            annualized_performance REAL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Add time_played column to existing tables (if it doesn't exist)
-    try:
-        cursor.execute("ALTER TABLE historical_games ADD COLUMN time_played TEXT")
-    except sqlite3.OperationalError:
-        # Column already exists, ignore
-        pass
+def init_pool():
+    """Fill the connection pool (called at startup)"""
+    while not _pool.full():
+        _pool.put_nowait(get_db_connection())
+
+@contextmanager
+def acquire():
+    """Borrow a pooled connection for the duration of a with-block.
     
-    # Add total_pnl column to existing tables (if it doesn't exist)
+    Commits on success and rolls back on error. Never blocks: if the pool is empty a new
+    connection is opened, and it is closed on return if the pool is already full.
+    """
     try:
-        cursor.execute("ALTER TABLE historical_games ADD COLUMN total_pnl REAL")
-    except sqlite3.OperationalError:
-        # Column already exists, ignore
-        pass
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = get_db_connection()
     
-    # Add shareable_id column for shareable results
     try:
-        cursor.execute("ALTER TABLE historical_games ADD COLUMN shareable_id TEXT UNIQUE")
-    except sqlite3.OperationalError:
-        # Column already exists, ignore
-        pass
+        with conn:
+            yield conn
+    finally:
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+@atexit.register
+def close_pool():
+    """Close every pooled connection (registered to run at interpreter exit)"""
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+# Columns added to historical_games after its first release, in the order they were added.
+# SQLite cannot ADD COLUMN with a UNIQUE constraint, so shareable_id is added as plain TEXT.
+HISTORICAL_GAMES_ADDED_COLUMNS = [
+    ("time_played", "TEXT"),
+    ("total_pnl", "REAL"),
+    ("shareable_id", "TEXT"),
+    ("results_data", "TEXT"),  # JSON data (awards, etc.)
+    ("firm_cash", "REAL"),
+    ("game_days_played", "INTEGER"),
+    ("annualized_performance", "REAL"),
+    ("finishing_nav", "REAL"),
+]
+
+def init_database():
+    """Initialize database tables"""
+    with acquire() as conn:
+        cursor = conn.cursor()
+        
+        # WAL lets readers run concurrently with the writer; the setting is stored in the DB file
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
+        # Games in progress table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS games_in_progress (
+                id TEXT PRIMARY KEY,
+                fund_name TEXT NOT NULL,
+                time_started TIMESTAMP NOT NULL,
+                geolocation TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Historical games table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS historical_games (
+                id TEXT PRIMARY KEY,
+                fund_name TEXT NOT NULL,
+                time_started TIMESTAMP NOT NULL,
+                time_ended TIMESTAMP,
+                completed BOOLEAN NOT NULL DEFAULT 0,
+                geolocation TEXT,
+                time_played TEXT,
+                total_pnl REAL,
+                shareable_id TEXT UNIQUE,
+                results_data TEXT,
+                firm_cash REAL,
+                game_days_played INTEGER,
+                annualized_performance REAL,
+                finishing_nav REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Admin content tables: the full item is stored as JSON in `data`,
+        # with `id` and `active` mirrored into columns for lookups and filtering
+        for table in CONTENT_TABLES:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id TEXT PRIMARY KEY,
+                    active INTEGER NOT NULL DEFAULT 1,
+                    data TEXT NOT NULL
+                )
+            """)
+            _seed_content_table(cursor, table)
+        
+        # Unified messages: the full message is stored as JSON in `data`, with the
+        # fields the endpoints filter on mirrored into columns
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                channel TEXT NOT NULL,
+                content_type TEXT,
+                active INTEGER NOT NULL DEFAULT 1,
+                data TEXT NOT NULL
+            )
+        """)
+        _seed_messages_table(cursor)
+        
+        # Add columns introduced after the original schema to existing tables.
+        # Read the current columns once instead of attempting every ALTER on each boot.
+        cursor.execute("PRAGMA table_info(historical_games)")
+        existing_columns = {row["name"] for row in cursor.fetchall()}
+        for column, column_type in HISTORICAL_GAMES_ADDED_COLUMNS:
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE historical_games ADD COLUMN {column} {column_type}")
+        
+        # Create indexes for better query performance
+        # Covering index for the expiry scan in move_old_games_to_historical
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_games_in_progress_expiry 
+            ON games_in_progress(time_started, id, fund_name, geolocation)
+        """)
+        # Superseded by idx_games_in_progress_expiry (same leading column)
+        cursor.execute("DROP INDEX IF EXISTS idx_games_in_progress_time_started")
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_historical_games_total_pnl 
+            ON historical_games(total_pnl DESC)
+        """)
+        
+        # Covering index for the historical list: the default time_started sort, its keyset
+        # seek on (time_started, id) and the fund_name search are answered from the index
+        # alone, without touching table rows that carry the results_data blob. Ascending
+        # columns so DESC pages are a reverse scan rather than a sort.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_historical_games_list 
+            ON historical_games(time_started, id, fund_name, time_ended, completed, geolocation, time_played, total_pnl, created_at)
+        """)
+        # Superseded by idx_historical_games_list (same leading columns)
+        cursor.execute("DROP INDEX IF EXISTS idx_historical_games_time_started")
+        cursor.execute("DROP INDEX IF EXISTS idx_historical_games_time_started_id")
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_historical_games_leaderboard 
+            ON historical_games(total_pnl, id) WHERE total_pnl > 0
+        """)
+        
+        # Shareable results lookups; also enforces uniqueness on databases where shareable_id
+        # was added by ALTER TABLE (which can't carry UNIQUE). Partial, since most rows have no id.
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_historical_games_shareable_id 
+            ON historical_games(shareable_id) WHERE shareable_id IS NOT NULL
+        """)
+        
+        # Channel/type filters used by /messages and the legacy /content/flavor and /content/news
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_messages_channel_type 
+            ON messages(channel, content_type, active)
+        """)
+
+def _seed_content_table(cursor: sqlite3.Cursor, table: str):
+    """Import a content table's legacy JSON file if the table is still empty"""
+    cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+    if cursor.fetchone():
+        return
     
-    # Add results_data column to store JSON data (awards, etc.)
-    try:
-        cursor.execute("ALTER TABLE historical_games ADD COLUMN results_data TEXT")
-    except sqlite3.OperationalError:
-        # Column already exists, ignore
-        pass
+    filename, id_prefix = CONTENT_TABLES[table]
+    file_path = DATA_DIR / filename
+    if not file_path.exists():
+        return
     
-    # Add firm_cash column
     try:
-        cursor.execute("ALTER TABLE historical_games ADD COLUMN firm_cash REAL")
-    except sqlite3.OperationalError:
-        # Column already exists, ignore
-        pass
+        items = orjson.loads(file_path.read_bytes())
+    except orjson.JSONDecodeError as e:
+        print(f"Error seeding {table} from {filename}: {e}")
+        return
+    
+    rows = []
+    for item in items:
+        if "id" not in item:
+            item["id"] = f"{id_prefix}-{secrets.token_urlsafe(9)}"
+        rows.append((item["id"], 1 if item.get("active", True) else 0, orjson.dumps(item).decode()))
+    
+    # Keep the first occurrence of any duplicate id, as the old linear scans did
+    cursor.executemany(f"INSERT OR IGNORE INTO {table} (id, active, data) VALUES (?, ?, ?)", rows)
+
+def list_content_items(table: str, active_only: bool = False) -> List[Dict[str, Any]]:
+    """List items from an admin content table in insertion order"""
+    if table not in CONTENT_TABLES:
+        raise ValueError(f"Unknown content table: {table}")
+    
+    where_clause = "WHERE active = 1" if active_only else ""
+    with acquire() as conn:
+        cursor = conn.execute(f"SELECT data FROM {table} {where_clause} ORDER BY rowid")
+        return [orjson.loads(row["data"]) for row in cursor]
+
+def add_content_item(table: str, item: Dict[str, Any]):
+    """Insert an item (which must have an id). Raises sqlite3.IntegrityError if the id exists."""
+    if table not in CONTENT_TABLES:
+        raise ValueError(f"Unknown content table: {table}")
+    
+    with acquire() as conn:
+        conn.execute(
+            f"INSERT INTO {table} (id, active, data) VALUES (?, ?, ?)",
+            (item["id"], 1 if item.get("active", True) else 0, orjson.dumps(item).decode())
+        )
+
+def update_content_item(table: str, item_id: str, updates: Dict[str, Any]) -> bool:
+    """Merge updates into an item. Returns True if updated, False if not found."""
+    if table not in CONTENT_TABLES:
+        raise ValueError(f"Unknown content table: {table}")
+    
+    with acquire() as conn:
+        # Take the write lock up front so concurrent read-modify-writes can't interleave
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (item_id,)).fetchone()
+        if not row:
+            return False
+        
+        item = orjson.loads(row["data"])
+        item.update(updates)
+        conn.execute(
+            f"UPDATE {table} SET id = ?, active = ?, data = ? WHERE id = ?",
+            (item.get("id", item_id), 1 if item.get("active", True) else 0, orjson.dumps(item).decode(), item_id)
+        )
+    return True
+
+def _message_row(message: Dict[str, Any]) -> tuple:
+    """Column values for a message: (id, channel, content_type, active, data)"""
+    content = message.get("content")
+    content_type = content.get("type") if isinstance(content, dict) else None
+    return (
+        message["id"],
+        message["channel"],
+        content_type,
+        1 if message.get("active", True) else 0,
+        orjson.dumps(message).decode(),
+    )
+
+def _seed_messages_table(cursor: sqlite3.Cursor):
+    """Import messages.json if the messages table is still empty"""
+    cursor.execute("SELECT 1 FROM messages LIMIT 1")
+    if cursor.fetchone():
+        return
     
-    # Add game_days_played column
-    try:
-        cursor.execute("ALTER TABLE historical_games ADD COLUMN game_days_played INTEGER")
-    except sqlite3.OperationalError:
-        # Column already exists, ignore
-        pass
+    file_path = DATA_DIR / MESSAGES_SEED_FILE
+    if not file_path.exists():
+        return
     
-    # Add annualized_performance column
     try:
-        cursor.execute("ALTER TABLE historical_games ADD COLUMN annualized_performance REAL")
-    except sqlite3.OperationalError:
-        # Column already exists, ignore
-        pass
-    
-    # Create indexes for better query performance
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_games_in_progress_time_started 
-        ON games_in_progress(time_started)
-    """)
-    
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_historical_games_time_started 
-        ON historical_games(time_started)
-    """)
-    
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_historical_games_total_pnl 
-        ON historical_games(total_pnl DESC)
-    """)
-    
-    conn.commit()
-    conn.close()
+        messages = orjson.loads(file_path.read_bytes())
+    except orjson.JSONDecodeError as e:
+        print(f"Error seeding messages from {MESSAGES_SEED_FILE}: {e}")
+        return
+    
+    rows = []
+    for message in messages:
+        if "id" not in message:
+            message["id"] = f"{message['channel']}-{secrets.token_urlsafe(9)}"
+        rows.append(_message_row(message))
+    
+    # Keep the first occurrence of any duplicate id, as the old linear scans did
+    cursor.executemany(
+        "INSERT OR IGNORE INTO messages (id, channel, content_type, active, data) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
+
+def list_messages(
+    channel: Optional[str] = None,
+    content_types: Optional[tuple] = None,
+    active_only: bool = False
+) -> List[Dict[str, Any]]:
+    """List messages in insertion order, optionally filtered by channel and content type"""
+    conditions = []
+    params: List[Any] = []
+    if channel is not None:
+        conditions.append("channel = ?")
+        params.append(channel)
+    if content_types:
+        conditions.append(f"content_type IN ({', '.join('?' * len(content_types))})")
+        params.extend(content_types)
+    if active_only:
+        conditions.append("active = 1")
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    with acquire() as conn:
+        cursor = conn.execute(f"SELECT data FROM messages {where_clause} ORDER BY rowid", params)
+        return [orjson.loads(row["data"]) for row in cursor]
+
+def get_message(message_id: str) -> Optional[Dict[str, Any]]:
+    """Get a message by id, or None if it doesn't exist"""
+    with acquire() as conn:
+        row = conn.execute("SELECT data FROM messages WHERE id = ?", (message_id,)).fetchone()
+    return orjson.loads(row["data"]) if row else None
+
+def add_message(message: Dict[str, Any]):
+    """Insert a message (which must have an id). Raises sqlite3.IntegrityError if the id exists."""
+    with acquire() as conn:
+        conn.execute(
+            "INSERT INTO messages (id, channel, content_type, active, data) VALUES (?, ?, ?, ?, ?)",
+            _message_row(message)
+        )
+
+def update_message(message_id: str, updates: Dict[str, Any]) -> bool:
+    """Merge updates into a message. Returns True if updated, False if not found."""
+    with acquire() as conn:
+        # Take the write lock up front so concurrent read-modify-writes can't interleave
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT data FROM messages WHERE id = ?", (message_id,)).fetchone()
+        if not row:
+            return False
+        
+        message = orjson.loads(row["data"])
+        message.update(updates)
+        message.setdefault("id", message_id)
+        conn.execute(
+            "UPDATE messages SET id = ?, channel = ?, content_type = ?, active = ?, data = ? WHERE id = ?",
+            _message_row(message) + (message_id,)
+        )
+    return True
+
+def deactivate_message(message_id: str) -> bool:
+    """Soft-delete a message in a single statement. Returns True if found, False otherwise."""
+    with acquire() as conn:
+        cursor = conn.execute(
+            "UPDATE messages SET active = 0, data = json_set(data, '$.active', json('false')) WHERE id = ?",
+            (message_id,)
+        )
+        found = cursor.rowcount > 0
+    return found
+
+def _ymd_to_ordinal(value: str) -> int:
+    """Convert a 'YYYY-MM-DD' string to a day ordinal, slicing digits instead of using strptime"""
+    if len(value) == 10 and value[4] == '-' and value[7] == '-':
+        return date(int(value[:4]), int(value[5:7]), int(value[8:10])).toordinal()
+    # Unpadded forms like '2024-1-5' are still accepted, as before
+    return datetime.strptime(value, '%Y-%m-%d').toordinal()
 
 def calculate_game_days(game_start_date: Optional[str], game_end_date: Optional[str]) -> Optional[int]:
     """Calculate number of game days played from game dates"""
@@ -136,12 +408,9 @@ def calculate_game_days(game_start_date: Optional[str], game_end_date: Optional[
         return None
     
     try:
-        start = datetime.strptime(game_start_date, '%Y-%m-%d')
-        end = datetime.strptime(game_end_date, '%Y-%m-%d')
-        delta = end - start
-        days = delta.days + 1  # Include both start and end day
+        days = _ymd_to_ordinal(game_end_date) - _ymd_to_ordinal(game_start_date) + 1  # Include both start and end day
         return max(1, days)  # At least 1 day
-    except (ValueError, AttributeError) as e:
+    except (ValueError, TypeError, AttributeError) as e:
         print(f"Error calculating game_days: {e}, game_start_date={game_start_date}, game_end_date={game_end_date}")
         return None
 
@@ -167,102 +436,71 @@ def calculate_annualized_performance(finishing_nav: float, game_days: int) -> Op
         print(f"Error calculating annualized_performance: {e}")
         return None
 
-def calculate_time_played(time_started: str, time_ended: Optional[str]) -> Optional[str]:
-    """Calculate time played in minutes and seconds format (e.g., '5m 30s')
+def time_played_sql(start: str, end: str) -> str:
+    """SQL expression computing time_played between two timestamp expressions.
     
-    Handles both SQLite datetime format ('YYYY-MM-DD HH:MM:SS') and ISO format.
+    Produces '5m 30s' or '30s' (NULL if negative). Evaluated by SQLite so stored
+    timestamps never have to be parsed into datetime objects in Python.
     """
-    if not time_ended:
-        return None
-    
-    try:
-        # Handle SQLite datetime format (space-separated) and ISO format (T-separated)
-        start_str = time_started.replace('Z', '+00:00').replace(' ', 'T', 1)
-        end_str = time_ended.replace('Z', '+00:00').replace(' ', 'T', 1)
-        
-        # Parse datetime strings
-        if '+' in start_str or start_str.endswith('Z'):
-            start = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-        else:
-            # SQLite format: 'YYYY-MM-DD HH:MM:SS'
-            start = datetime.strptime(time_started, '%Y-%m-%d %H:%M:%S')
-        
-        if '+' in end_str or end_str.endswith('Z'):
-            end = datetime.fromisoformat(end_str.replace('Z', '+00:00'))
-        else:
-            # SQLite format: 'YYYY-MM-DD HH:MM:SS'
-            end = datetime.strptime(time_ended, '%Y-%m-%d %H:%M:%S')
-        
-        delta = end - start
-        total_seconds = int(delta.total_seconds())
-        
-        if total_seconds < 0:
-            return None
-        
-        minutes = total_seconds // 60
-        seconds = total_seconds % 60
-        
-        if minutes > 0:
-            return f"{minutes}m {seconds}s"
-        else:
-            return f"{seconds}s"
-    except (ValueError, AttributeError) as e:
-        print(f"Error calculating time_played: {e}, time_started={time_started}, time_ended={time_ended}")
-        return None
+    elapsed = f"(CAST(strftime('%s', {end}) AS INTEGER) - CAST(strftime('%s', {start}) AS INTEGER))"
+    return f"""CASE
+        WHEN {elapsed} < 0 THEN NULL
+        WHEN {elapsed} >= 60 THEN printf('%dm %ds', {elapsed} / 60, {elapsed} % 60)
+        ELSE printf('%ds', {elapsed})
+    END"""
 
-def move_old_games_to_historical():
-    """Move games older than 1 hour from in_progress to historical with completed=False"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Find games started more than 1 hour ago
-    cursor.execute("""
-        SELECT id, fund_name, time_started, geolocation
-        FROM games_in_progress
-        WHERE datetime(time_started) < datetime('now', '-1 hour')
-    """)
-    
-    old_games = cursor.fetchall()
-    
-    for game in old_games:
-        # Insert into historical (preserve the UUID)
-        cursor.execute("""
-            INSERT INTO historical_games (id, fund_name, time_started, time_ended, completed, geolocation)
-            VALUES (?, ?, ?, datetime('now'), 0, ?)
-        """, (game['id'], game['fund_name'], game['time_started'], game['geolocation']))
+# time_played for a historical_games row
+TIME_PLAYED_SQL = time_played_sql("time_started", "time_ended")
+
+# Statements for the maintenance path, built once so every call reuses the
+# connection's compiled statement instead of re-preparing the SQL
+MOVE_OLD_GAMES_INSERT_SQL = f"""
+    INSERT INTO historical_games (id, fund_name, time_started, time_ended, completed, geolocation, time_played)
+    SELECT id, fund_name, time_started, :now, 0, geolocation, {time_played_sql("time_started", ":now")}
+    FROM games_in_progress
+    WHERE time_started < :cutoff
+"""
+
+MOVE_OLD_GAMES_DELETE_SQL = """
+    DELETE FROM games_in_progress
+    WHERE time_started < :cutoff
+"""
+
+DELETE_HISTORICAL_GAME_SQL = "DELETE FROM historical_games WHERE id = ?"
+
+# In-progress games older than this are considered abandoned
+GAME_MAX_AGE_HOURS = 1
+
+def move_old_games_to_historical(max_age_hours: float = GAME_MAX_AGE_HOURS) -> int:
+    """Move games older than max_age_hours from in_progress to historical with completed=False"""
+    # Compute the cutoff once in Python and compare against the raw column so the
+    # time_started index can be used (wrapping it in datetime() defeats the index).
+    # Timestamps are stored as 'YYYY-MM-DD HH:MM:SS' (UTC), which orders lexicographically.
+    now_dt = datetime.now(timezone.utc)
+    now = now_dt.strftime(SQLITE_DATETIME_FORMAT)
+    cutoff = (now_dt - timedelta(hours=max_age_hours)).strftime(SQLITE_DATETIME_FORMAT)
+    
+    with acquire() as conn:
+        cursor = conn.cursor()
         
-        # Get the inserted time_ended to calculate time_played
-        cursor.execute("""
-            SELECT time_ended FROM historical_games WHERE id = ?
-        """, (game['id'],))
-        result = cursor.fetchone()
-        time_ended = result['time_ended'] if result else None
+        # Take the write lock before reading so the scan and the writes can't be
+        # interleaved with another writer (and never need a lock upgrade under WAL)
+        cursor.execute("BEGIN IMMEDIATE")
         
-        # Calculate and update time_played
-        time_played = calculate_time_played(game['time_started'], time_ended)
-        if time_played:
-            cursor.execute("""
-                UPDATE historical_games SET time_played = ? WHERE id = ?
-            """, (time_played, game['id']))
+        # Copy expired games into historical (preserve the UUID), computing time_played in SQL
+        cursor.execute(MOVE_OLD_GAMES_INSERT_SQL, {"now": now, "cutoff": cutoff})
+        moved_count = cursor.rowcount
         
-        # Delete from in_progress
-        cursor.execute("DELETE FROM games_in_progress WHERE id = ?", (game['id'],))
-    
-    conn.commit()
-    conn.close()
+        # Delete the same set from in_progress (same cutoff, same write lock)
+        cursor.execute(MOVE_OLD_GAMES_DELETE_SQL, {"cutoff": cutoff})
     
-    return len(old_games)
+    return moved_count
 
 def delete_historical_game(game_id: str) -> bool:
     """Delete a historical game by ID. Returns True if deleted, False if not found."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM historical_games WHERE id = ?", (game_id,))
-    deleted = cursor.rowcount > 0
-    
-    conn.commit()
-    conn.close()
+    with acquire() as conn:
+        cursor = conn.execute(DELETE_HISTORICAL_GAME_SQL, (game_id,))
+        deleted = cursor.rowcount > 0
     
     return deleted
 
@@ -314,17 +552,13 @@ def format_seconds_to_time_played(total_seconds: int) -> str:
 
 def get_total_time_played() -> str:
     """Calculate total time played across all historical games"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     # Get all time_played values
-    cursor.execute("""
-        SELECT time_played FROM historical_games
-        WHERE time_played IS NOT NULL
-    """)
-    
-    rows = cursor.fetchall()
-    conn.close()
+    with acquire() as conn:
+        cursor = conn.execute("""
+            SELECT time_played FROM historical_games
+            WHERE time_played IS NOT NULL
+        """)
+        rows = cursor.fetchall()
     
     total_seconds = 0
     for row in rows:
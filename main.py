@@ -1,11 +1,14 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from routers import admin, messages, games
 import database
+import asyncio
 import os
 
-app = FastAPI(title="Pod Shop Content API", version="1.0.0")
+# Serialize responses with orjson (results_data payloads can be large)
+app = FastAPI(title="Pod Shop Content API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Unified message system (includes legacy /api/content/* endpoints for backward compatibility)
 app.include_router(messages.router, prefix="/api", tags=["messages"])
@@ -27,32 +30,31 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+async def maintenance_loop():
+    """Background task that periodically runs maintenance"""
+    while True:
+        await games.run_maintenance()
+        await asyncio.sleep(games.MAINTENANCE_INTERVAL)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and start background tasks"""
     database.init_database()
-    
-class MoveOldGamesMiddleware(BaseHTTPMiddleware):
-    """Middleware to move old games to historical"""
-    async def dispatch(self, request: Request, call_next):
-        # Only run on API requests, not too frequently
-        if request.url.path.startswith("/api/games") and request.method == "GET":
-            try:
-                database.move_old_games_to_historical()
-            except Exception as e:
-                # Don't fail the request if maintenance fails
-                print(f"Error moving old games: {e}")
-        
-        response = await call_next(request)
-        return response
+    database.init_pool()
+    app.state.maintenance_task = asyncio.create_task(maintenance_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks"""
+    app.state.maintenance_task.cancel()
 
-# Add custom middleware first (runs last)
-app.add_middleware(MoveOldGamesMiddleware)
+# Compress JSON responses (historical lists and results_data can be large); small ones go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # CORS middleware must be added LAST so it runs FIRST (middleware runs in reverse order)
 # This ensures CORS headers are added to all responses
 # Get allowed origins from environment variable or use defaults
-allowed_origins = os.getenv("CORS_ORIGINS", "").split(",") if os.getenv("CORS_ORIGINS") else []
+allowed_origins = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
 # Add default localhost origins
 default_origins = [
     "http://localhost:3000",
@@ -60,8 +62,8 @@ default_origins = [
     "http://127.0.0.1:3000",
     "http://127.0.0.1:3001",
 ]
-# Combine and filter out empty strings
-all_origins = [origin for origin in default_origins + allowed_origins if origin]
+# Combine and remove duplicates (preserving order); CORSMiddleware checks this list on every request
+all_origins = list(dict.fromkeys(default_origins + allowed_origins))
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
-from typing import Dict, Any, List, Optional
-import json
+from hmac import compare_digest
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
 from pathlib import Path
 import os
+import tempfile
+import sqlite3
+import secrets
 import database
 
 router = APIRouter()
@@ -14,6 +18,10 @@ DATA_DIR.mkdir(exist_ok=True)
 # Simple token authentication
 # In production, use proper authentication (JWT, OAuth, etc.)
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "change-me-in-production")
+_ADMIN_TOKEN_BYTES = ADMIN_TOKEN.encode()
+
+# Set PRETTY=1 to write data files indented for hand editing
+JSON_DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if os.getenv("PRETTY") == "1" else 0)
 
 def verify_token(authorization: Optional[str] = Header(None)):
     """Verify admin token from Authorization header"""
@@ -21,105 +29,116 @@ def verify_token(authorization: Optional[str] = Header(None)):
         raise HTTPException(status_code=401, detail="Authorization header required")
     
     # Support both "Bearer token" and just "token"
-    token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
+    token = authorization[7:] if authorization.startswith("Bearer ") else authorization
     
-    if token != ADMIN_TOKEN:
+    # Constant-time comparison so response timing doesn't reveal how much of the token matched
+    if not compare_digest(token.encode(), _ADMIN_TOKEN_BYTES):
         raise HTTPException(status_code=401, detail="Invalid admin token")
     return True
 
+# Parsed JSON files keyed by filename: (st_mtime_ns, data)
+# Reads are served from memory until the file changes on disk.
+_json_cache: Dict[str, Tuple[int, Any]] = {}
+
 def _load_json_file(filename: str, default: Any = None):
-    """Load JSON file or return default"""
+    """Load JSON file (cached until its mtime changes) or return default"""
     file_path = DATA_DIR / filename
     if file_path.exists():
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            mtime = file_path.stat().st_mtime_ns
+            cached = _json_cache.get(filename)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            data = orjson.loads(file_path.read_bytes())
+            _json_cache[filename] = (mtime, data)
+            return data
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error reading {filename}: {str(e)}")
     return default if default is not None else []
 
 def _save_json_file(filename: str, data: Any):
-    """Save data to JSON file"""
+    """Save data to JSON file atomically and refresh the cache"""
     file_path = DATA_DIR / filename
+    tmp_name = None
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Write to a sibling temp file and rename over the original so a crash never leaves a partial file
+        with tempfile.NamedTemporaryFile(dir=DATA_DIR, prefix=f".{filename}.", suffix=".tmp", delete=False) as f:
+            tmp_name = f.name
+            f.write(orjson.dumps(data, option=JSON_DUMP_OPTIONS))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, file_path)
+        _json_cache[filename] = (file_path.stat().st_mtime_ns, data)
     except Exception as e:
+        _json_cache.pop(filename, None)
+        if tmp_name and os.path.exists(tmp_name):
+            os.unlink(tmp_name)
         raise HTTPException(status_code=500, detail=f"Error writing {filename}: {str(e)}")
 
+def _add_content_item(table: str, item: Dict[str, Any]):
+    """Insert a content item, mapping duplicate ids to 409"""
+    try:
+        database.add_content_item(table, item)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail=f"Item {item['id']} already exists")
+
+def _update_content_item(table: str, item_id: str, updates: Dict[str, Any]) -> bool:
+    """Merge updates into a content item, rejecting bad ids (400) and id collisions (409)"""
+    if "id" in updates and (not isinstance(updates["id"], str) or not updates["id"]):
+        raise HTTPException(status_code=400, detail="id must be a non-empty string")
+    try:
+        return database.update_content_item(table, item_id, updates)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail=f"Item {updates['id']} already exists")
+
 # ===== FLAVOR TEXT ENDPOINTS =====
 
 @router.get("/flavor")
-async def list_flavor_text(_: bool = Depends(verify_token)) -> List[Dict[str, Any]]:
+def list_flavor_text(_: bool = Depends(verify_token)) -> List[Dict[str, Any]]:
     """List all flavor text items"""
-    return _load_json_file("flavor_text.json", [])
+    return database.list_content_items("flavor_text")
 
 @router.post("/flavor")
-async def add_flavor_text(item: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def add_flavor_text(item: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Add new flavor text item"""
-    items = _load_json_file("flavor_text.json", [])
-    
     # Generate ID if not provided
     if "id" not in item:
-        item["id"] = f"flavor-{len(items) + 1}"
+        item["id"] = f"flavor-{secrets.token_urlsafe(9)}"
     
     # Set defaults
     if "active" not in item:
         item["active"] = True
     
-    items.append(item)
-    _save_json_file("flavor_text.json", items)
+    _add_content_item("flavor_text", item)
     
     return {"status": "added", "item": item}
 
 @router.put("/flavor/{item_id}")
-async def update_flavor_text(item_id: str, updates: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def update_flavor_text(item_id: str, updates: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Update existing flavor text item"""
-    items = _load_json_file("flavor_text.json", [])
-    
-    found = False
-    for item in items:
-        if item.get("id") == item_id:
-            item.update(updates)
-            found = True
-            break
-    
-    if not found:
+    if not _update_content_item("flavor_text", item_id, updates):
         raise HTTPException(status_code=404, detail=f"Flavor text item {item_id} not found")
     
-    _save_json_file("flavor_text.json", items)
     return {"status": "updated", "item_id": item_id}
 
 @router.delete("/flavor/{item_id}")
-async def delete_flavor_text(item_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def delete_flavor_text(item_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Delete flavor text item (soft delete by setting active=false)"""
-    items = _load_json_file("flavor_text.json", [])
-    
-    found = False
-    for item in items:
-        if item.get("id") == item_id:
-            item["active"] = False
-            found = True
-            break
-    
-    if not found:
+    if not database.update_content_item("flavor_text", item_id, {"active": False}):
         raise HTTPException(status_code=404, detail=f"Flavor text item {item_id} not found")
     
-    _save_json_file("flavor_text.json", items)
     return {"status": "deleted", "item_id": item_id}
 
 # ===== RECRUITMENT CANDIDATES ENDPOINTS =====
 
 @router.get("/recruitment/candidates")
-async def list_candidates(_: bool = Depends(verify_token)) -> List[Dict[str, Any]]:
+def list_candidates(_: bool = Depends(verify_token)) -> List[Dict[str, Any]]:
     """List all recruitment candidates"""
-    return _load_json_file("recruitment_candidates.json", [])
+    return database.list_content_items("recruitment_candidates")
 
 @router.post("/recruitment/candidates")
-async def add_candidate(candidate: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def add_candidate(candidate: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Add a new recruitment candidate"""
-    candidates = _load_json_file("recruitment_candidates.json", [])
-    
     # Validate required fields
     required_fields = ["specialism", "beta_mu", "beta_sigma", "vol_range", "first_name", "last_name", "bio"]
     for field in required_fields:
@@ -128,62 +147,41 @@ async def add_candidate(candidate: Dict[str, Any], _: bool = Depends(verify_toke
     
     # Generate ID if not provided
     if "id" not in candidate:
-        candidate["id"] = f"candidate-{len(candidates) + 1}"
+        candidate["id"] = f"candidate-{secrets.token_urlsafe(9)}"
     
     # Set defaults
     if "active" not in candidate:
         candidate["active"] = True
     
-    candidates.append(candidate)
-    _save_json_file("recruitment_candidates.json", candidates)
+    _add_content_item("recruitment_candidates", candidate)
     
     return {"status": "added", "candidate": candidate}
 
 @router.put("/recruitment/candidates/{candidate_id}")
-async def update_candidate(candidate_id: str, updates: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def update_candidate(candidate_id: str, updates: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Update an existing recruitment candidate"""
-    candidates = _load_json_file("recruitment_candidates.json", [])
-    
-    found = False
-    for candidate in candidates:
-        if candidate.get("id") == candidate_id:
-            candidate.update(updates)
-            found = True
-            break
-    
-    if not found:
+    if not _update_content_item("recruitment_candidates", candidate_id, updates):
         raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} not found")
     
-    _save_json_file("recruitment_candidates.json", candidates)
     return {"status": "updated", "candidate_id": candidate_id}
 
 @router.delete("/recruitment/candidates/{candidate_id}")
-async def delete_candidate(candidate_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def delete_candidate(candidate_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Delete a candidate (soft delete by setting active=false)"""
-    candidates = _load_json_file("recruitment_candidates.json", [])
-    
-    found = False
-    for candidate in candidates:
-        if candidate.get("id") == candidate_id:
-            candidate["active"] = False
-            found = True
-            break
-    
-    if not found:
+    if not database.update_content_item("recruitment_candidates", candidate_id, {"active": False}):
         raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} not found")
     
-    _save_json_file("recruitment_candidates.json", candidates)
     return {"status": "deleted", "candidate_id": candidate_id}
 
 # ===== LEGACY RECRUITMENT ENDPOINTS (for backward compatibility) =====
 
 @router.get("/recruitment")
-async def get_recruitment_data(_: bool = Depends(verify_token)) -> Dict[str, Any]:
+def get_recruitment_data(_: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Legacy endpoint - returns recruitment configuration in old format"""
     return _load_json_file("recruitment.json", {})
 
 @router.put("/recruitment")
-async def update_recruitment_data(data: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def update_recruitment_data(data: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Legacy endpoint - update recruitment configuration in old format"""
     _save_json_file("recruitment.json", data)
     return {"status": "updated", "data": data}
@@ -191,18 +189,16 @@ async def update_recruitment_data(data: Dict[str, Any], _: bool = Depends(verify
 # ===== NEWS TEMPLATES ENDPOINTS =====
 
 @router.get("/news")
-async def list_news_templates(_: bool = Depends(verify_token)) -> List[Dict[str, Any]]:
+def list_news_templates(_: bool = Depends(verify_token)) -> List[Dict[str, Any]]:
     """List all news templates"""
-    return _load_json_file("news_templates.json", [])
+    return database.list_content_items("news_templates")
 
 @router.post("/news")
-async def add_news_template(template: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def add_news_template(template: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Add new news template"""
-    templates = _load_json_file("news_templates.json", [])
-    
     # Generate ID if not provided
     if "id" not in template:
-        template["id"] = f"news-{len(templates) + 1}"
+        template["id"] = f"news-{secrets.token_urlsafe(9)}"
     
     # Set defaults
     if "active" not in template:
@@ -214,51 +210,30 @@ async def add_news_template(template: Dict[str, Any], _: bool = Depends(verify_t
     if "probability" not in template:
         template["probability"] = 0.03
     
-    templates.append(template)
-    _save_json_file("news_templates.json", templates)
+    _add_content_item("news_templates", template)
     
     return {"status": "added", "template": template}
 
 @router.put("/news/{template_id}")
-async def update_news_template(template_id: str, updates: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def update_news_template(template_id: str, updates: Dict[str, Any], _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Update existing news template"""
-    templates = _load_json_file("news_templates.json", [])
-    
-    found = False
-    for template in templates:
-        if template.get("id") == template_id:
-            template.update(updates)
-            found = True
-            break
-    
-    if not found:
+    if not _update_content_item("news_templates", template_id, updates):
         raise HTTPException(status_code=404, detail=f"News template {template_id} not found")
     
-    _save_json_file("news_templates.json", templates)
     return {"status": "updated", "template_id": template_id}
 
 @router.delete("/news/{template_id}")
-async def delete_news_template(template_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def delete_news_template(template_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Delete news template (soft delete by setting active=false)"""
-    templates = _load_json_file("news_templates.json", [])
-    
-    found = False
-    for template in templates:
-        if template.get("id") == template_id:
-            template["active"] = False
-            found = True
-            break
-    
-    if not found:
+    if not database.update_content_item("news_templates", template_id, {"active": False}):
         raise HTTPException(status_code=404, detail=f"News template {template_id} not found")
     
-    _save_json_file("news_templates.json", templates)
     return {"status": "deleted", "template_id": template_id}
 
 # ===== HISTORICAL GAMES ENDPOINTS =====
 
 @router.delete("/games/historical/{game_id}")
-async def delete_historical_game(game_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
+def delete_historical_game(game_id: str, _: bool = Depends(verify_token)) -> Dict[str, Any]:
     """Delete a historical game from the database"""
     deleted = database.delete_historical_game(game_id)
     
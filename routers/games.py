@@ -1,15 +1,47 @@
 """
 API endpoints for game tracking
 """
-from fastapi import APIRouter, HTTPException, Request, Body
+from fastapi import APIRouter, HTTPException, Request, Body, Depends, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 import database
+import asyncio
+import base64
+import binascii
+import secrets
+import time
 import uuid
-import json
+import orjson
 
-router = APIRouter()
+# How often old games are moved to historical (seconds)
+MAINTENANCE_INTERVAL = 60
+_last_maintenance_run = 0.0
+
+async def run_maintenance():
+    """Move old games to historical off the event loop"""
+    global _last_maintenance_run
+    _last_maintenance_run = time.monotonic()
+    try:
+        await asyncio.to_thread(database.move_old_games_to_historical)
+    except Exception as e:
+        # Don't let maintenance failures propagate
+        print(f"Error moving old games: {e}")
+
+async def maybe_run_maintenance(request: Request):
+    """Run maintenance before game GETs if the background task hasn't run recently"""
+    if request.method == "GET" and time.monotonic() - _last_maintenance_run >= MAINTENANCE_INTERVAL:
+        await run_maintenance()
+
+# Manual move-old-games calls within this window reuse the last result (seconds)
+MOVE_OLD_GAMES_THROTTLE = 30
+_move_lock = asyncio.Lock()
+_last_move_ts = float("-inf")
+_last_move_count = 0
+
+# Only game routes pay for the maintenance check (not health, admin, messages or CORS preflights)
+router = APIRouter(dependencies=[Depends(maybe_run_maintenance)])
 
 class GameInProgressCreate(BaseModel):
     fund_name: str
@@ -26,99 +58,153 @@ class HistoricalGameCreate(BaseModel):
     completed: bool = False
     geolocation: Optional[str] = None
 
+# Response models; timestamps stay as the 'YYYY-MM-DD HH:MM:SS' strings SQLite stores
+class GameInProgressOut(BaseModel):
+    id: str
+    fund_name: str
+    time_started: str
+    geolocation: Optional[str] = None
+    created_at: Optional[str] = None
+
+class HistoricalGameOut(BaseModel):
+    id: str
+    fund_name: str
+    time_started: str
+    time_ended: Optional[str] = None
+    completed: bool
+    geolocation: Optional[str] = None
+    time_played: Optional[str] = None
+    total_pnl: Optional[float] = None
+    created_at: Optional[str] = None
+
+def _encode_cursor(*values) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+
+def _decode_cursor(page_cursor: str, size: int = 2) -> list:
+    """Decode a cursor produced by _encode_cursor"""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(page_cursor.encode()))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Only scalars can be bound into the row-value comparison
+    if not all(value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool)) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+# Totals are selected as an uncorrelated scalar subquery on the page query, so SQLite
+# evaluates them once and the page still walks the index in order. COUNT(*) OVER ()
+# would materialize and re-sort every matching row.
+IN_PROGRESS_COUNT_SQL = "SELECT COUNT(*) FROM games_in_progress"
+LEADERBOARD_COUNT_SQL = "SELECT COUNT(*) FROM historical_games WHERE total_pnl IS NOT NULL AND total_pnl > 0"
+
+def _game_dict(row, *exclude: str) -> dict:
+    """Build a response dict from a row (columns are selected under their response keys)"""
+    game = dict(row)
+    # Drop the page total carried on list rows and anything the response doesn't expose
+    for key in ("total",) + exclude:
+        game.pop(key, None)
+    if "completed" in game:
+        game["completed"] = bool(game["completed"])
+    return game
+
+def _page_total(cursor, rows, count_query: str, params, offset: int) -> int:
+    """Read the total carried on the page's rows, counting directly only for a page past the end"""
+    if rows:
+        return rows[0]["total"]
+    if offset <= 0:
+        return 0
+    cursor.execute(count_query, params)
+    return cursor.fetchone()[0]
+
 @router.get("/games/in-progress")
-async def list_games_in_progress(limit: int = 50, offset: int = 0):
-    """List games in progress with pagination"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get total count
-    cursor.execute("""
-        SELECT COUNT(*) as total
-        FROM games_in_progress
-    """)
-    total_result = cursor.fetchone()
-    total_count = total_result["total"] if total_result else 0
-    
-    # Get paginated games
-    cursor.execute("""
-        SELECT id, fund_name, time_started, geolocation, created_at
-        FROM games_in_progress
-        ORDER BY time_started DESC
-        LIMIT ? OFFSET ?
-    """, (limit, offset))
-    
-    games = cursor.fetchall()
-    conn.close()
+async def list_games_in_progress(
+    limit: int = Query(50, ge=0),
+    offset: int = 0,
+    page_cursor: Optional[str] = Query(None, alias="cursor")
+):
+    """List games in progress with pagination.
+    
+    Pass the previous page's next_cursor as `cursor` to seek straight to the next page
+    (no OFFSET scan, no COUNT; total is null). Otherwise pages by offset.
+    """
+    with database.acquire() as conn:
+        cursor = conn.cursor()
+        
+        # Fetch one extra row to know whether there is another page
+        if page_cursor is not None:
+            last_time_started, last_id = _decode_cursor(page_cursor)
+            total_count = None
+            cursor.execute("""
+                SELECT id, fund_name, time_started, geolocation, created_at
+                FROM games_in_progress
+                WHERE (time_started, id) < (?, ?)
+                ORDER BY time_started DESC, id DESC
+                LIMIT ?
+            """, (last_time_started, last_id, limit + 1))
+        else:
+            # Get paginated games with the total count carried on each row
+            cursor.execute(f"""
+                SELECT id, fund_name, time_started, geolocation, created_at,
+                       ({IN_PROGRESS_COUNT_SQL}) AS total
+                FROM games_in_progress
+                ORDER BY time_started DESC, id DESC
+                LIMIT ? OFFSET ?
+            """, (limit + 1, offset))
+        
+        games = cursor.fetchall()
+        if page_cursor is None:
+            total_count = _page_total(cursor, games, IN_PROGRESS_COUNT_SQL, (), offset)
+    
+    has_more = len(games) > limit
+    games = games[:limit]
+    next_cursor = _encode_cursor(games[-1]["time_started"], games[-1]["id"]) if has_more and games else None
     
     return {
-        "games": [
-            {
-                "id": game["id"],
-                "fund_name": game["fund_name"],
-                "time_started": game["time_started"],
-                "geolocation": game["geolocation"],
-                "created_at": game["created_at"]
-            }
-            for game in games
-        ],
+        "games": [_game_dict(game) for game in games],
         "total": total_count,
         "limit": limit,
         "offset": offset,
-        "has_more": (offset + limit) < total_count
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
 @router.post("/games/in-progress")
 async def create_game_in_progress(game: GameInProgressCreate):
     """Create a new game in progress"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
     # Generate UUID for the game
     game_id = str(uuid.uuid4())
     
-    cursor.execute("""
-        INSERT INTO games_in_progress (id, fund_name, time_started, geolocation)
-        VALUES (?, ?, datetime('now'), ?)
-    """, (game_id, game.fund_name, game.geolocation))
-    
-    conn.commit()
-    conn.close()
+    with database.acquire() as conn:
+        conn.execute("""
+            INSERT INTO games_in_progress (id, fund_name, time_started, geolocation)
+            VALUES (?, ?, datetime('now'), ?)
+        """, (game_id, game.fund_name, game.geolocation))
     
     return {"id": game_id, "message": "Game created successfully"}
 
-@router.get("/games/in-progress/{game_id}")
+@router.get("/games/in-progress/{game_id}", response_model=GameInProgressOut)
 async def get_game_in_progress(game_id: str):
     """Get a specific game in progress"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT id, fund_name, time_started, geolocation, created_at
-        FROM games_in_progress
-        WHERE id = ?
-    """, (game_id,))
-    
-    game = cursor.fetchone()
-    conn.close()
+    with database.acquire() as conn:
+        cursor = conn.execute("""
+            SELECT id, fund_name, time_started, geolocation, created_at
+            FROM games_in_progress
+            WHERE id = ?
+        """, (game_id,))
+        
+        game = cursor.fetchone()
     
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    return {
-        "id": game["id"],
-        "fund_name": game["fund_name"],
-        "time_started": game["time_started"],
-        "geolocation": game["geolocation"],
-        "created_at": game["created_at"]
-    }
+    return _game_dict(game)
 
 @router.put("/games/in-progress/{game_id}")
 async def update_game_in_progress(game_id: str, game: GameInProgressUpdate):
     """Update a game in progress"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
     # Build update query dynamically
     updates = []
     values = []
@@ -132,41 +218,41 @@ async def update_game_in_progress(game_id: str, game: GameInProgressUpdate):
         values.append(game.geolocation)
     
     if not updates:
-        conn.close()
         raise HTTPException(status_code=400, detail="No fields to update")
     
     values.append(game_id)
     query = f"UPDATE games_in_progress SET {', '.join(updates)} WHERE id = ?"
     
-    cursor.execute(query, values)
-    conn.commit()
+    with database.acquire() as conn:
+        cursor = conn.execute(query, values)
     
     if cursor.rowcount == 0:
-        conn.close()
         raise HTTPException(status_code=404, detail="Game not found")
     
-    conn.close()
     return {"message": "Game updated successfully"}
 
 @router.delete("/games/in-progress/{game_id}")
 async def delete_game_in_progress(game_id: str):
     """Delete a game in progress"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM games_in_progress WHERE id = ?", (game_id,))
-    conn.commit()
+    with database.acquire() as conn:
+        cursor = conn.execute("DELETE FROM games_in_progress WHERE id = ?", (game_id,))
     
     if cursor.rowcount == 0:
-        conn.close()
         raise HTTPException(status_code=404, detail="Game not found")
     
-    conn.close()
     return {"message": "Game deleted successfully"}
 
 class EndGameRequest(BaseModel):
     results_data: Optional[str] = None
 
+END_GAME_INSERT_SQL = f"""
+    INSERT INTO historical_games (id, fund_name, time_started, time_ended, completed, geolocation, total_pnl, shareable_id, results_data, firm_cash, game_days_played, annualized_performance, finishing_nav, time_played)
+    SELECT id, fund_name, time_started, datetime('now'), ?, geolocation, ?, ?, ?, ?, ?, ?, ?, {database.time_played_sql("time_started", "datetime('now')")}
+    FROM games_in_progress
+    WHERE id = ?
+    RETURNING time_ended, time_played
+"""
+
 @router.post("/games/in-progress/{game_id}/end")
 async def end_game(
     game_id: str, 
@@ -175,29 +261,16 @@ async def end_game(
     request_body: Optional[EndGameRequest] = Body(None)
 ):
     """Move a game from in-progress to historical"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get the game
-    cursor.execute("""
-        SELECT id, fund_name, time_started, geolocation
-        FROM games_in_progress
-        WHERE id = ?
-    """, (game_id,))
-    
-    game = cursor.fetchone()
-    if not game:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Game not found")
-    
     # Get results_data from request body if provided
+    raw_results_data = request_body.results_data if request_body else None
     results_data_str = None
     results_data_dict = None
-    if request_body and request_body.results_data:
-        results_data_str = request_body.results_data
+    if raw_results_data:
         try:
-            results_data_dict = json.loads(results_data_str)
-        except json.JSONDecodeError:
+            results_data_dict = orjson.loads(raw_results_data)
+            # Store a canonical compact encoding that reads can hand back without re-parsing
+            results_data_str = orjson.dumps(results_data_dict).decode()
+        except orjson.JSONDecodeError:
             results_data_dict = None
     
     # Extract metrics from results_data
@@ -206,7 +279,7 @@ async def end_game(
     annualized_performance = None
     finishing_nav = None
     
-    if results_data_dict:
+    if isinstance(results_data_dict, dict):
         firm_cash = results_data_dict.get('firmCash')
         game_start_date = results_data_dict.get('gameStartDate')
         game_end_date = results_data_dict.get('gameEndDate')
@@ -222,53 +295,43 @@ async def end_game(
     
     # Generate shareable_id if results_data is provided (retirement)
     shareable_id = None
-    if results_data_str:
-        shareable_id = str(uuid.uuid4())[:8]  # Short 8-character ID
-    
-    # Get time_ended from database after insertion to ensure consistent format
-    # First insert, then calculate time_played
-    cursor.execute("""
-        INSERT INTO historical_games (id, fund_name, time_started, time_ended, completed, geolocation, total_pnl, shareable_id, results_data, firm_cash, game_days_played, annualized_performance)
-        VALUES (?, ?, ?, datetime('now'), ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (game["id"], game["fund_name"], game["time_started"], completed, game["geolocation"], total_pnl, shareable_id, results_data_str, firm_cash, game_days_played, annualized_performance))
-    
-    # Get the inserted time_ended to calculate time_played
-    cursor.execute("""
-        SELECT time_ended FROM historical_games WHERE id = ?
-    """, (game_id,))
-    result = cursor.fetchone()
-    time_ended = result["time_ended"] if result else None
-    
-    # Calculate and update time_played
-    time_played = database.calculate_time_played(game["time_started"], time_ended)
-    if time_played:
-        cursor.execute("""
-            UPDATE historical_games SET time_played = ? WHERE id = ?
-        """, (time_played, game_id))
-    
-    # Delete from in_progress
-    cursor.execute("DELETE FROM games_in_progress WHERE id = ?", (game_id,))
-    
-    conn.commit()
-    conn.close()
+    if raw_results_data:
+        shareable_id = secrets.token_urlsafe(6)  # Short 8-character URL-safe ID (48 random bits)
+    
+    with database.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        
+        # Copy the game across in one statement; no row back means no such game
+        cursor.execute(END_GAME_INSERT_SQL, (completed, total_pnl, shareable_id, results_data_str, firm_cash, game_days_played, annualized_performance, finishing_nav, game_id))
+        ended = cursor.fetchone()
+        if not ended:
+            raise HTTPException(status_code=404, detail="Game not found")
+        
+        # Delete from in_progress
+        cursor.execute("DELETE FROM games_in_progress WHERE id = ?", (game_id,))
     
     return {
         "message": "Game moved to historical",
-        "shareable_id": shareable_id
+        "shareable_id": shareable_id,
+        "time_ended": ended["time_ended"],
+        "time_played": ended["time_played"]
     }
 
 @router.get("/games/historical")
 async def list_historical_games(
-    limit: int = 50, 
+    limit: int = Query(50, ge=0), 
     offset: int = 0, 
     search: Optional[str] = None,
     sort_by: Optional[str] = "time_started",
-    sort_order: Optional[str] = "DESC"
+    sort_order: Optional[str] = "DESC",
+    page_cursor: Optional[str] = Query(None, alias="cursor")
 ):
-    """List historical games with pagination, search, and sorting"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
+    """List historical games with pagination, search, and sorting.
     
+    When sorting by time_started, pass the previous page's next_cursor as `cursor` to seek
+    straight to the next page (no OFFSET scan, no COUNT; total is null).
+    """
     # Validate sort_by column (prevent SQL injection)
     allowed_columns = {
         'id', 'fund_name', 'time_started', 'time_ended', 
@@ -283,6 +346,9 @@ async def list_historical_games(
     if sort_order not in ('ASC', 'DESC'):
         sort_order = 'DESC'
     
+    if page_cursor is not None and sort_by != 'time_started':
+        raise HTTPException(status_code=400, detail="cursor pagination is only supported when sorting by time_started")
+    
     # Build WHERE clause for search
     where_clause = ""
     params = []
@@ -290,40 +356,97 @@ async def list_historical_games(
         where_clause = "WHERE fund_name LIKE ?"
         params.append(f"%{search}%")
     
-    # Get total count (with search filter if applicable)
-    count_query = f"SELECT COUNT(*) as total FROM historical_games {where_clause}"
-    cursor.execute(count_query, params)
-    total_result = cursor.fetchone()
-    total_count = total_result["total"] if total_result else 0
+    with database.acquire() as conn:
+        cursor = conn.cursor()
+        
+        if page_cursor is not None:
+            # Seek past the last row of the previous page using the (time_started, id) index
+            last_time_started, last_id = _decode_cursor(page_cursor)
+            comparison = ">" if sort_order == 'ASC' else "<"
+            seek_clause = f"(time_started, id) {comparison} (?, ?)"
+            total_count = None
+        
+        # The total count (with search filter if applicable) rides along on each row of a page
+        count_query = f"SELECT COUNT(*) FROM historical_games {where_clause}"
+        
+        # Special handling for time_played sorting (sort by duration, not alphabetically)
+        if sort_by == 'time_played':
+            # Fetch all matching games to sort by duration in Python
+            query = f"""
+                SELECT id, fund_name, time_started, time_ended, completed, geolocation, time_played, total_pnl, created_at
+                FROM historical_games
+                {where_clause}
+            """
+            cursor.execute(query, params)
+            all_games = cursor.fetchall()
+            total_count = len(all_games)
+        elif sort_by == 'time_started':
+            # time_started is NOT NULL; id breaks ties so the order is stable for cursors
+            if page_cursor is not None:
+                where_seek = f"{where_clause} AND {seek_clause}" if where_clause else f"WHERE {seek_clause}"
+                query_params = params + [last_time_started, last_id, limit + 1]
+                offset_clause = ""
+            else:
+                where_seek = where_clause
+                query_params = params + params + [limit + 1, offset]
+                offset_clause = "OFFSET ?"
+            total_column = f", ({count_query}) AS total" if page_cursor is None else ""
+            query = f"""
+                SELECT id, fund_name, time_started, time_ended, completed, geolocation, time_played, total_pnl, created_at{total_column}
+                FROM historical_games
+                {where_seek}
+                ORDER BY time_started {sort_order}, id {sort_order}
+                LIMIT ? {offset_clause}
+            """
+            cursor.execute(query, query_params)
+            games = cursor.fetchall()
+            if page_cursor is None:
+                total_count = _page_total(cursor, games, count_query, params, offset)
+        else:
+            # Handle NULL values in sorting (put NULLs last)
+            # SQLite doesn't support NULLS LAST directly in all versions, so we use CASE
+            # For datetime/float columns that can be NULL
+            if sort_by in ('time_ended', 'created_at', 'total_pnl', 'geolocation'):
+                # Use CASE to put NULLs last: CASE WHEN column IS NULL THEN 1 ELSE 0 END, then the column
+                if sort_order == 'ASC':
+                    order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} ASC"
+                else:
+                    order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} DESC"
+            elif sort_by == 'completed':
+                # For boolean, convert to integer for proper sorting
+                order_clause = f"ORDER BY CAST({sort_by} AS INTEGER) {sort_order}"
+            else:
+                # For text columns (id, fund_name)
+                if sort_order == 'ASC':
+                    order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} ASC"
+                else:
+                    order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} DESC"
+            
+            # Get paginated games (with search filter and sorting)
+            query = f"""
+                SELECT id, fund_name, time_started, time_ended, completed, geolocation, time_played, total_pnl, created_at,
+                       ({count_query}) AS total
+                FROM historical_games
+                {where_clause}
+                {order_clause}
+                LIMIT ? OFFSET ?
+            """
+            query_params = params + params + [limit + 1, offset]
+            cursor.execute(query, query_params)
+            games = cursor.fetchall()
+            total_count = _page_total(cursor, games, count_query, params, offset)
+    
+    # Calculate total time played across all historical games
+    total_time_played = database.get_total_time_played()
     
-    # Special handling for time_played sorting (sort by duration, not alphabetically)
     if sort_by == 'time_played':
-        # Fetch all matching games to sort by duration in Python
-        query = f"""
-            SELECT id, fund_name, time_started, time_ended, completed, geolocation, time_played, total_pnl, created_at
-            FROM historical_games
-            {where_clause}
-        """
-        cursor.execute(query, params)
-        all_games = cursor.fetchall()
-        
         # Convert to list of dicts and add duration in seconds for sorting
         games_with_duration = []
         for game in all_games:
             time_played = game["time_played"]
-            game_dict = {
-                "id": game["id"],
-                "fund_name": game["fund_name"],
-                "time_started": game["time_started"],
-                "time_ended": game["time_ended"],
-                "completed": bool(game["completed"]),
-                "geolocation": game["geolocation"],
-                "time_played": time_played,
-                "total_pnl": game["total_pnl"],
-                "created_at": game["created_at"],
-                "_duration_seconds": database.parse_time_played_to_seconds(time_played) if time_played else None,
-                "_has_time": time_played is not None
-            }
+            game_dict = _game_dict(game)
+            game_dict["_duration_seconds"] = database.parse_time_played_to_seconds(time_played) if time_played else None
+            game_dict["_has_time"] = time_played is not None
             games_with_duration.append(game_dict)
         
         # Sort by duration seconds
@@ -341,68 +464,24 @@ async def list_historical_games(
         
         # Apply pagination
         games_paginated = games_with_duration[offset:offset + limit]
+        has_more = (offset + limit) < total_count
+        next_cursor = None
         
         # Remove the helper fields
-        games = [
+        games_list = [
             {k: v for k, v in game.items() if k not in ("_duration_seconds", "_has_time")}
             for game in games_paginated
         ]
     else:
-        # Handle NULL values in sorting (put NULLs last)
-        # SQLite doesn't support NULLS LAST directly in all versions, so we use CASE
-        # For datetime/float columns that can be NULL
-        if sort_by in ('time_started', 'time_ended', 'created_at', 'total_pnl', 'geolocation'):
-            # Use CASE to put NULLs last: CASE WHEN column IS NULL THEN 1 ELSE 0 END, then the column
-            if sort_order == 'ASC':
-                order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} ASC"
-            else:
-                order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} DESC"
-        elif sort_by == 'completed':
-            # For boolean, convert to integer for proper sorting
-            order_clause = f"ORDER BY CAST({sort_by} AS INTEGER) {sort_order}"
-        else:
-            # For text columns (id, fund_name)
-            if sort_order == 'ASC':
-                order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} ASC"
-            else:
-                order_clause = f"ORDER BY CASE WHEN {sort_by} IS NULL THEN 1 ELSE 0 END, {sort_by} DESC"
-        
-        # Get paginated games (with search filter and sorting)
-        query = f"""
-            SELECT id, fund_name, time_started, time_ended, completed, geolocation, time_played, total_pnl, created_at
-            FROM historical_games
-            {where_clause}
-            {order_clause}
-            LIMIT ? OFFSET ?
-        """
-        query_params = params + [limit, offset]
-        cursor.execute(query, query_params)
+        # One extra row was fetched to detect another page
+        has_more = len(games) > limit
+        games = games[:limit]
+        next_cursor = None
+        if has_more and games and sort_by == 'time_started':
+            next_cursor = _encode_cursor(games[-1]["time_started"], games[-1]["id"])
         
-        # Calculate total time played across all historical games
-    total_time_played = database.get_total_time_played()
-    
-    conn.close()
-    
-    # Convert games to dicts if they're Row objects (when not sorting by time_played)
-    if sort_by == 'time_played':
-        # Games are already dicts when sorting by time_played
-        games_list = games
-    else:
         # Convert Row objects to dicts
-        games_list = [
-            {
-                "id": game["id"],
-                "fund_name": game["fund_name"],
-                "time_started": game["time_started"],
-                "time_ended": game["time_ended"],
-                "completed": bool(game["completed"]),
-                "geolocation": game["geolocation"],
-                "time_played": game["time_played"],
-                "total_pnl": game["total_pnl"],
-                "created_at": game["created_at"]
-            }
-            for game in games
-        ]
+        games_list = [_game_dict(game) for game in games]
     
     return {
         "games": games_list,
@@ -410,124 +489,113 @@ async def list_historical_games(
         "total_time_played": total_time_played,
         "limit": limit,
         "offset": offset,
-        "has_more": (offset + limit) < total_count
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
-@router.get("/games/historical/{game_id}")
+@router.get("/games/historical/{game_id}", response_model=HistoricalGameOut)
 async def get_historical_game(game_id: str):
     """Get a specific historical game"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT id, fund_name, time_started, time_ended, completed, geolocation, time_played, total_pnl, created_at
-        FROM historical_games
-        WHERE id = ?
-    """, (game_id,))
-    
-    game = cursor.fetchone()
-    conn.close()
+    with database.acquire() as conn:
+        cursor = conn.execute("""
+            SELECT id, fund_name, time_started, time_ended, completed, geolocation, time_played, total_pnl, created_at
+            FROM historical_games
+            WHERE id = ?
+        """, (game_id,))
+        
+        game = cursor.fetchone()
     
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    return {
-        "id": game["id"],
-        "fund_name": game["fund_name"],
-        "time_started": game["time_started"],
-        "time_ended": game["time_ended"],
-        "completed": bool(game["completed"]),
-        "geolocation": game["geolocation"],
-        "time_played": game["time_played"],
-        "total_pnl": game["total_pnl"],
-        "created_at": game["created_at"]
-    }
+    return _game_dict(game)
 
 @router.post("/games/maintenance/move-old-games")
 async def move_old_games():
     """Manually trigger moving old games to historical"""
-    moved_count = database.move_old_games_to_historical()
+    global _last_move_ts, _last_move_count
+    # Concurrent or repeated calls share one run instead of each rescanning the table
+    async with _move_lock:
+        if time.monotonic() - _last_move_ts >= MOVE_OLD_GAMES_THROTTLE:
+            _last_move_count = await asyncio.to_thread(database.move_old_games_to_historical)
+            _last_move_ts = time.monotonic()
+        moved_count = _last_move_count
     return {"message": f"Moved {moved_count} games to historical"}
 
 @router.get("/games/results/{shareable_id}")
 async def get_game_results(shareable_id: str):
     """Get game results by shareable ID"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT id, fund_name, time_started, time_ended, completed, total_pnl, results_data, time_played, game_days_played, annualized_performance
-        FROM historical_games
-        WHERE shareable_id = ?
-    """, (shareable_id,))
-    
-    game = cursor.fetchone()
-    conn.close()
+    with database.acquire() as conn:
+        cursor = conn.execute("""
+            SELECT id, fund_name, time_started, time_ended, completed, total_pnl, time_played, game_days_played, annualized_performance,
+                   CASE WHEN json_valid(results_data) THEN results_data END AS results_data
+            FROM historical_games
+            WHERE shareable_id = ?
+        """, (shareable_id,))
+        
+        game = cursor.fetchone()
     
     if not game:
         raise HTTPException(status_code=404, detail="Results not found")
     
-    # Parse results_data JSON
-    results_data = None
-    if game["results_data"]:
-        try:
-            results_data = json.loads(game["results_data"])
-        except json.JSONDecodeError:
-            results_data = None
-    
-    return {
-        "id": game["id"],
-        "fund_name": game["fund_name"],
-        "time_started": game["time_started"],
-        "time_ended": game["time_ended"],
-        "completed": bool(game["completed"]),
-        "total_pnl": game["total_pnl"],
-        "time_played": game["time_played"],
-        "game_days_played": game["game_days_played"],
-        "annualized_performance": game["annualized_performance"],
-        "results_data": results_data
-    }
+    # results_data is already valid JSON (checked by json_valid in SQL), so embed it
+    # as-is instead of parsing it into Python objects and serializing it again
+    results_data = game["results_data"]
+    game = _game_dict(game)
+    game["results_data"] = orjson.Fragment(results_data) if results_data else None
+    return ORJSONResponse(game)
 
 @router.get("/leaderboard")
-async def get_leaderboard(limit: int = 20, offset: int = 0):
-    """Get leaderboard with pagination - only shows entries with positive PnL"""
-    conn = database.get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get total count (only positive PnL)
-    cursor.execute("""
-        SELECT COUNT(*) as total
-        FROM historical_games
-        WHERE total_pnl IS NOT NULL AND total_pnl > 0
-    """)
-    total_result = cursor.fetchone()
-    total_count = total_result["total"] if total_result else 0
-    
-    # Get leaderboard entries (sorted by total_pnl DESC, only positive PnL)
-    cursor.execute("""
-        SELECT fund_name, total_pnl, time_ended, completed
-        FROM historical_games
-        WHERE total_pnl IS NOT NULL AND total_pnl > 0
-        ORDER BY total_pnl DESC
-        LIMIT ? OFFSET ?
-    """, (limit, offset))
-    
-    entries = cursor.fetchall()
-    conn.close()
+async def get_leaderboard(
+    limit: int = Query(20, ge=0),
+    offset: int = 0,
+    page_cursor: Optional[str] = Query(None, alias="cursor")
+):
+    """Get leaderboard with pagination - only shows entries with positive PnL.
+    
+    Pass the previous page's next_cursor as `cursor` to seek straight to the next page
+    (no OFFSET scan, no COUNT; total is null). Otherwise pages by offset.
+    """
+    with database.acquire() as conn:
+        cursor = conn.cursor()
+        
+        # Fetch one extra row to know whether there is another page
+        if page_cursor is not None:
+            last_pnl, last_id = _decode_cursor(page_cursor)
+            total_count = None
+            cursor.execute("""
+                SELECT id, fund_name, total_pnl, time_ended, completed
+                FROM historical_games
+                WHERE total_pnl IS NOT NULL AND total_pnl > 0
+                AND (total_pnl, id) < (?, ?)
+                ORDER BY total_pnl DESC, id DESC
+                LIMIT ?
+            """, (last_pnl, last_id, limit + 1))
+        else:
+            # Get leaderboard entries (sorted by total_pnl DESC, only positive PnL) with the total count
+            cursor.execute(f"""
+                SELECT id, fund_name, total_pnl, time_ended, completed,
+                       ({LEADERBOARD_COUNT_SQL}) AS total
+                FROM historical_games
+                WHERE total_pnl IS NOT NULL AND total_pnl > 0
+                ORDER BY total_pnl DESC, id DESC
+                LIMIT ? OFFSET ?
+            """, (limit + 1, offset))
+        
+        entries = cursor.fetchall()
+        if page_cursor is None:
+            total_count = _page_total(cursor, entries, LEADERBOARD_COUNT_SQL, (), offset)
+    
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    next_cursor = _encode_cursor(entries[-1]["total_pnl"], entries[-1]["id"]) if has_more and entries else None
     
     return {
-        "entries": [
-            {
-                "fund_name": entry["fund_name"],
-                "total_pnl": entry["total_pnl"],
-                "time_ended": entry["time_ended"],
-                "completed": bool(entry["completed"])
-            }
-            for entry in entries
-        ],
+        # id is only selected for the cursor
+        "entries": [_game_dict(entry, "id") for entry in entries],
         "total": total_count,
         "limit": limit,
         "offset": offset,
-        "has_more": (offset + limit) < total_count
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
-
@@ -1,8 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
-from typing import Dict, Any, List, Optional, Literal
-import json
+from hmac import compare_digest
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, Any, List, Optional, Literal, Tuple
+import orjson
 from pathlib import Path
 import os
+import secrets
+import sqlite3
+import threading
+import database
 
 router = APIRouter()
 
@@ -12,40 +18,93 @@ DATA_DIR.mkdir(exist_ok=True)
 
 # Simple token authentication
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "change-me-in-production")
+_ADMIN_TOKEN_BYTES = ADMIN_TOKEN.encode()
 
 def verify_token(authorization: Optional[str] = Header(None)):
     """Verify admin token from Authorization header"""
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
-    token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-    if token != ADMIN_TOKEN:
+    token = authorization[7:] if authorization.startswith("Bearer ") else authorization
+    # Constant-time comparison so response timing doesn't reveal how much of the token matched
+    if not compare_digest(token.encode(), _ADMIN_TOKEN_BYTES):
         raise HTTPException(status_code=401, detail="Invalid admin token")
     return True
 
+# Parsed JSON files keyed by filename: (st_mtime_ns, st_size, data)
+# The hot GET endpoints are served from memory until the file changes on disk.
+_json_cache: Dict[str, Tuple[int, int, Any]] = {}
+
 def _load_json_file(filename: str, default: Any = None):
-    """Load JSON file or return default"""
+    """Load JSON file (cached until its mtime or size changes) or return default"""
     file_path = DATA_DIR / filename
     if file_path.exists():
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            stat = file_path.stat()
+            cached = _json_cache.get(filename)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached[2]
+            data = orjson.loads(file_path.read_bytes())
+            _json_cache[filename] = (stat.st_mtime_ns, stat.st_size, data)
+            return data
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error reading {filename}: {str(e)}")
     return default if default is not None else []
 
-def _save_json_file(filename: str, data: Any):
-    """Save data to JSON file"""
-    file_path = DATA_DIR / filename
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error writing {filename}: {str(e)}")
+NEWS_TYPES = ("info", "alert", "breaking")
+
+# Legacy /content views, built from the messages table on first read and dropped
+# whenever a message is written: {view name: list in legacy format}
+_legacy_views: Dict[str, List[Dict[str, Any]]] = {}
+_legacy_views_generation = 0
+_legacy_views_lock = threading.Lock()
+
+def _invalidate_legacy_views():
+    """Drop the prebuilt legacy views after a message write"""
+    global _legacy_views_generation
+    with _legacy_views_lock:
+        _legacy_views_generation += 1
+        _legacy_views.clear()
+
+def _cached_view(name: str, build) -> List[Dict[str, Any]]:
+    """Return a prebuilt legacy view, building it if a write invalidated it"""
+    view = _legacy_views.get(name)
+    if view is None:
+        generation = _legacy_views_generation
+        view = build()
+        with _legacy_views_lock:
+            # Don't cache a view that a concurrent write has already made stale
+            if generation == _legacy_views_generation:
+                _legacy_views[name] = view
+    return view
+
+# Message payloads are validated up front; unknown keys are kept as-is
+class MessageFeatures(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    read_only: Optional[bool] = None
+    requires_response: Optional[bool] = None
+
+class MessageImpact(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    type: Optional[Literal["none", "simulation", "user_action"]] = None
+
+class MessageContent(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    type: Optional[str] = None
+
+class MessageCreate(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    id: Optional[str] = None
+    channel: Literal["newswire", "email", "ledger"]
+    creation_trigger: Literal["random", "game_event"]
+    features: MessageFeatures
+    impact: MessageImpact
+    content: MessageContent
+    active: bool = True
 
 # ===== UNIFIED MESSAGE ENDPOINTS =====
 
 @router.get("/messages")
-async def get_messages(
+def get_messages(
     channel: Optional[Literal["newswire", "email", "ledger"]] = None,
     active_only: bool = True
 ) -> List[Dict[str, Any]]:
@@ -53,23 +112,12 @@ async def get_messages(
     Get all messages, optionally filtered by channel.
     Unified endpoint for all message types.
     """
-    messages = _load_json_file("messages.json", [])
-    
-    # Filter by channel if specified
-    if channel:
-        messages = [m for m in messages if m.get("channel") == channel]
-    
-    # Filter active if requested
-    if active_only:
-        messages = [m for m in messages if m.get("active", True)]
-    
-    return messages
+    return database.list_messages(channel=channel, active_only=active_only)
 
 @router.get("/messages/{message_id}")
-async def get_message(message_id: str) -> Dict[str, Any]:
+def get_message(message_id: str) -> Dict[str, Any]:
     """Get a specific message by ID"""
-    messages = _load_json_file("messages.json", [])
-    message = next((m for m in messages if m.get("id") == message_id), None)
+    message = database.get_message(message_id)
     if not message:
         raise HTTPException(status_code=404, detail=f"Message {message_id} not found")
     return message
@@ -77,7 +125,7 @@ async def get_message(message_id: str) -> Dict[str, Any]:
 # ===== ADMIN ENDPOINTS =====
 
 @router.post("/messages", dependencies=[Depends(verify_token)])
-async def create_message(message: Dict[str, Any]) -> Dict[str, Any]:
+def create_message(payload: MessageCreate) -> Dict[str, Any]:
     """
     Create a new message.
     
@@ -88,87 +136,69 @@ async def create_message(message: Dict[str, Any]) -> Dict[str, Any]:
     - impact: { type: "none" | "simulation" | "user_action", ... }
     - content: { ... }
     """
-    messages = _load_json_file("messages.json", [])
-    
-    # Validate required fields
-    required_fields = ["channel", "creation_trigger", "features", "impact", "content"]
-    for field in required_fields:
-        if field not in message:
-            raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-    
-    # Validate channel
-    if message["channel"] not in ["newswire", "email", "ledger"]:
-        raise HTTPException(status_code=400, detail="channel must be 'newswire', 'email', or 'ledger'")
-    
-    # Validate creation_trigger
-    if message["creation_trigger"] not in ["random", "game_event"]:
-        raise HTTPException(status_code=400, detail="creation_trigger must be 'random' or 'game_event'")
+    # Only keys the client sent are stored (plus id and active)
+    message = payload.model_dump(exclude_unset=True)
     
     # Generate ID if not provided
-    if "id" not in message:
-        message["id"] = f"{message['channel']}-{len(messages) + 1}"
+    if not payload.id:
+        message["id"] = f"{payload.channel}-{secrets.token_urlsafe(9)}"
     
     # Set defaults
-    if "active" not in message:
-        message["active"] = True
+    message["active"] = payload.active
     
-    messages.append(message)
-    _save_json_file("messages.json", messages)
+    try:
+        database.add_message(message)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail=f"Message {message['id']} already exists")
+    _invalidate_legacy_views()
     
     return {"status": "created", "message": message}
 
 @router.put("/messages/{message_id}", dependencies=[Depends(verify_token)])
-async def update_message(message_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+def update_message(message_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
     """Update an existing message"""
-    messages = _load_json_file("messages.json", [])
+    # id and channel back NOT NULL columns, so they can't be cleared or set to non-strings
+    for field in ("id", "channel"):
+        if field in updates and (not isinstance(updates[field], str) or not updates[field]):
+            raise HTTPException(status_code=400, detail=f"{field} must be a non-empty string")
     
-    found = False
-    for message in messages:
-        if message.get("id") == message_id:
-            message.update(updates)
-            found = True
-            break
-    
-    if not found:
+    try:
+        updated = database.update_message(message_id, updates)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail=f"Message {updates['id']} already exists")
+    if not updated:
         raise HTTPException(status_code=404, detail=f"Message {message_id} not found")
+    _invalidate_legacy_views()
     
-    _save_json_file("messages.json", messages)
     return {"status": "updated", "message_id": message_id}
 
 @router.delete("/messages/{message_id}", dependencies=[Depends(verify_token)])
-async def delete_message(message_id: str) -> Dict[str, Any]:
+def delete_message(message_id: str) -> Dict[str, Any]:
     """Delete a message (soft delete by setting active=false)"""
-    messages = _load_json_file("messages.json", [])
-    
-    found = False
-    for message in messages:
-        if message.get("id") == message_id:
-            message["active"] = False
-            found = True
-            break
-    
-    if not found:
+    if not database.deactivate_message(message_id):
         raise HTTPException(status_code=404, detail=f"Message {message_id} not found")
+    _invalidate_legacy_views()
     
-    _save_json_file("messages.json", messages)
     return {"status": "deleted", "message_id": message_id}
 
 # ===== LEGACY ENDPOINTS (for backward compatibility with frontend) =====
 # These map to the new unified message system and are served under /api/content/*
 
+def _build_flavor_view() -> List[Dict[str, Any]]:
+    """Active newswire flavor messages converted to the legacy format"""
+    flavor_messages = database.list_messages(channel="newswire", content_types=("flavor",), active_only=True)
+    return [
+        {"id": m["id"], "text": m["content"].get("text", ""), "active": m.get("active", True)}
+        for m in flavor_messages
+    ]
+
 @router.get("/content/flavor")
-async def get_flavor_text() -> List[Dict[str, Any]]:
+def get_flavor_text() -> List[Dict[str, Any]]:
     """Legacy endpoint - maps to newswire messages with flavor type"""
-    messages = _load_json_file("messages.json", [])
-    flavor_messages = [
-        m for m in messages 
-        if m.get("channel") == "newswire" 
-        and m.get("content", {}).get("type") == "flavor"
-        and m.get("active", True)
-    ]
+    flavor_view = _cached_view("flavor", _build_flavor_view)
     
     # If no messages found, return defaults
-    if not flavor_messages:
+    if not flavor_view:
         return [
             {"id": "1", "text": "Analyst spotted crying in the bathroom.", "active": True},
             {"id": "2", "text": "Compliance officer is asking about your WhatsApps.", "active": True},
@@ -179,24 +209,19 @@ async def get_flavor_text() -> List[Dict[str, Any]]:
             {"id": "7", "text": "The printer is out of toner. The deal is stalled.", "active": True},
         ]
     
-    # Convert to legacy format
-    return [
-        {"id": m["id"], "text": m["content"].get("text", ""), "active": m.get("active", True)}
-        for m in flavor_messages
-    ]
+    return flavor_view
 
 @router.get("/content/recruitment")
-async def get_recruitment_data() -> Dict[str, Any]:
+def get_recruitment_data() -> Dict[str, Any]:
     """
     Legacy endpoint - returns recruitment configuration.
     Now supports both new format (candidates array) and old format (separate arrays).
     """
-    # Try new format first (recruitment_candidates.json)
-    candidates = _load_json_file("recruitment_candidates.json", [])
+    # Try new format first (recruitment_candidates table)
+    active_candidates = database.list_content_items("recruitment_candidates", active_only=True)
     
-    if candidates and isinstance(candidates, list) and len(candidates) > 0:
+    if active_candidates:
         # New format: convert to legacy format for backward compatibility
-        active_candidates = [c for c in candidates if c.get("active", True)]
         
         # Build legacy format from candidates
         specialisms = {}
@@ -253,19 +278,29 @@ async def get_recruitment_data() -> Dict[str, Any]:
     }
     return _load_json_file("recruitment.json", default_recruitment)
 
+def _build_news_view() -> List[Dict[str, Any]]:
+    """Active newswire news messages converted to the legacy format"""
+    news_messages = database.list_messages(channel="newswire", content_types=NEWS_TYPES, active_only=True)
+    return [
+        {
+            "id": m["id"],
+            "headline": m["content"].get("headline", ""),
+            "body": m["content"].get("body", ""),
+            "impact": m.get("impact", {}).get("simulation", {}),
+            "type": m["content"].get("type", "info"),
+            "probability": m.get("creation_trigger_config", {}).get("probability", 0.03),
+            "active": m.get("active", True)
+        }
+        for m in news_messages
+    ]
+
 @router.get("/content/news")
-async def get_news_templates() -> List[Dict[str, Any]]:
+def get_news_templates() -> List[Dict[str, Any]]:
     """Legacy endpoint - maps to newswire messages with news type"""
-    messages = _load_json_file("messages.json", [])
-    news_messages = [
-        m for m in messages
-        if m.get("channel") == "newswire"
-        and m.get("content", {}).get("type") in ["info", "alert", "breaking"]
-        and m.get("active", True)
-    ]
+    news_view = _cached_view("news", _build_news_view)
     
     # If no messages found, return minimal defaults
-    if not news_messages:
+    if not news_view:
         return [
             {
                 "id": "1",
@@ -278,17 +313,4 @@ async def get_news_templates() -> List[Dict[str, Any]]:
             }
         ]
     
-    # Convert to legacy format
-    return [
-        {
-            "id": m["id"],
-            "headline": m["content"].get("headline", ""),
-            "body": m["content"].get("body", ""),
-            "impact": m.get("impact", {}).get("simulation", {}),
-            "type": m["content"].get("type", "info"),
-            "probability": m.get("creation_trigger_config", {}).get("probability", 0.03),
-            "active": m.get("active", True)
-        }
-        for m in news_messages
-    ]
-
+    return news_view